@@ -1,6 +1,35 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class HomeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "home"
+
+    def ready(self):
+        from wagtail.images import get_image_model
+        from wagtail.models import PageViewRestriction
+        from wagtail.signals import page_published, page_unpublished
+
+        from .models import ClientTestimonial, PressCut
+        from .signals import (
+            clear_deleted_card_rendition_urls,
+            clear_home_listings_cache,
+            clear_page_cache,
+            refresh_card_rendition_urls,
+        )
+
+        # Projets publiés / dépubliés, snippets modifiés et pages rendues privées
+        # (ou de nouveau publiques, sans publication) : les pages en cache changent
+        for handler in (clear_home_listings_cache, clear_page_cache):
+            page_published.connect(handler)
+            page_unpublished.connect(handler)
+            for model in (ClientTestimonial, PressCut, PageViewRestriction):
+                post_save.connect(handler, sender=model)
+                post_delete.connect(handler, sender=model)
+
+        # Vignettes précalculées des études de cas : recalculées quand l'image change,
+        # oubliées quand leur rendition est supprimée
+        Image = get_image_model()
+        post_save.connect(refresh_card_rendition_urls, sender=Image)
+        post_delete.connect(clear_deleted_card_rendition_urls, sender=Image.get_rendition_model())
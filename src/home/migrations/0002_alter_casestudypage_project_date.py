@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-15 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='casestudypage',
+            name='project_date',
+            field=models.DateField(db_index=True, verbose_name='Date du projet'),
+        ),
+    ]
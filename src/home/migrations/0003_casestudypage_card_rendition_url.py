@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-15 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_alter_casestudypage_project_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casestudypage',
+            name='card_rendition_url',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+    ]
@@ -1,12 +1,16 @@
 """
 models.py — optimizer_labs / home app
 """
-from django.db import models
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef, Prefetch, prefetch_related_objects
+from django.utils.cache import patch_cache_control
 from django.utils.translation import gettext_lazy as _
 
 from modelcluster.fields import ParentalKey
 from modelcluster.contrib.taggit import ClusterTaggableManager
-from taggit.models import TaggedItemBase
+from taggit.models import Tag, TaggedItemBase
 
 from wagtail.models import Page, Orderable
 from wagtail.fields import RichTextField, StreamField
@@ -19,9 +23,27 @@ from wagtail.admin.panels import (
 )
 from wagtail.snippets.models import register_snippet
 from wagtail.contrib.forms.models import AbstractEmailForm, AbstractFormField
+from wagtail.images import get_image_model
+from wagtail.images.models import SourceImageIOError
 from wagtail.search import index
 
 
+def _prefetch_image(field_name, *filter_specs):
+    """Prefetch d'une FK image avec ses renditions (une requête IN pour tout le lot)."""
+    return Prefetch(
+        field_name,
+        queryset=get_image_model().objects.prefetch_renditions(*filter_specs),
+    )
+
+
+def _prefetch_card_images(projects):
+    """Images des cartes sans vignette précalculée — les autres n'en ont pas besoin."""
+    prefetch_related_objects(
+        [project for project in projects if not project.card_rendition_url],
+        _prefetch_image("main_image", "fill-600x400"),
+    )
+
+
 # ---------------------------------------------------------------------------
 # SNIPPETS
 # ---------------------------------------------------------------------------
@@ -263,7 +285,7 @@ class CaseStudyPage(Page):
     """Page d'étude de cas — structure fixe : contexte, problème, solution, résultats."""
 
     # Méta-données
-    project_date = models.DateField(verbose_name=_("Date du projet"))
+    project_date = models.DateField(db_index=True, verbose_name=_("Date du projet"))
     client_sector = models.CharField(
         max_length=100,
         verbose_name=_("Secteur du client"),
@@ -279,6 +301,9 @@ class CaseStudyPage(Page):
         verbose_name=_("Image principale"),
     )
 
+    # URL précalculée de la vignette des cartes (listes) — évite la table des renditions
+    card_rendition_url = models.CharField(max_length=500, blank=True, editable=False)
+
     # Structure fixe
     context = RichTextField(
         verbose_name=_("Contexte client"),
@@ -315,6 +340,27 @@ class CaseStudyPage(Page):
     parent_page_types = ["home.CaseStudyIndexPage"]
     subpage_types = []
 
+    # Colonnes utiles aux cartes des listes (accueil, index) : évite de charger
+    # les quatre RichTextField pour chaque ligne
+    listing_fields = [
+        "title",
+        "slug",
+        "url_path",
+        "path",
+        "depth",
+        "numchild",
+        "live",
+        "content_type",
+        "locale",
+        "project_date",
+        "client_sector",
+        "main_image",
+        "card_rendition_url",
+    ]
+
+    # Filtre de la vignette affichée sur les cartes (accueil, index)
+    card_rendition_filter = "fill-600x400|format-webp"
+
     search_fields = Page.search_fields + [
         index.SearchField("context"),
         index.SearchField("problem"),
@@ -329,6 +375,69 @@ class CaseStudyPage(Page):
 
     template = "home/case_study_page.html"
 
+    def get_context(self, request, *args, **kwargs):
+        context = super().get_context(request, *args, **kwargs)
+
+        # Images de la galerie avec toutes les renditions du srcset du template
+        context["gallery_images"] = self.gallery_images.all().prefetch_related(
+            _prefetch_image("image", "fill-300x200", "fill-600x400")
+        )
+        return context
+
+    def update_card_rendition_url(self):
+        """Recalcule l'URL de la vignette à partir de l'image principale."""
+        self.card_rendition_url = ""
+        if self.main_image_id:
+            try:
+                rendition = self.main_image.get_rendition(self.card_rendition_filter)
+            except SourceImageIOError:
+                # Fichier source absent : les templates retombent sur {% image %}
+                return
+            self.card_rendition_url = rendition.url
+
+    def commit_gallery_images(self):
+        """
+        Enregistre les images de galerie en attente par requêtes groupées, au lieu
+        d'un DELETE / INSERT / UPDATE par image dans le commit de modelcluster.
+        """
+        pending = getattr(self, "_cluster_related_objects", {}).pop("gallery_images", None)
+        if pending is None:
+            return
+
+        live_images = CaseStudyGalleryImage.objects.filter(page=self)
+        live_ids = set(live_images.values_list("pk", flat=True))
+        live_images.exclude(pk__in=[item.pk for item in pending if item.pk in live_ids]).delete()
+
+        for item in pending:
+            item.page = self
+        CaseStudyGalleryImage.objects.bulk_create(
+            [item for item in pending if item.pk not in live_ids], batch_size=100
+        )
+        CaseStudyGalleryImage.objects.bulk_update(
+            [item for item in pending if item.pk in live_ids],
+            ["image", "caption", "sort_order"],
+            batch_size=100,
+        )
+
+    def save(self, *args, clean=True, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "card_rendition_url" in update_fields:
+            self.update_card_rendition_url()
+        if not (self.pk and (update_fields is None or "gallery_images" in update_fields)):
+            return super().save(*args, clean=clean, **kwargs)
+        # Validation faite ici comme dans Page.save(), pour qu'une page invalide
+        # ne touche jamais à la galerie en base
+        if clean:
+            if self.live:
+                self.full_clean()
+            else:
+                self.minimal_clean()
+        with transaction.atomic():
+            # Avant super().save() : les signaux post_save de la page (index des
+            # références...) relisent ainsi une galerie déjà à jour en base
+            self.commit_gallery_images()
+            return super().save(*args, clean=False, **kwargs)
+
 
 class CaseStudyIndexPage(Page):
     """Page listant toutes les études de cas, avec filtrage par tag."""
@@ -351,16 +460,40 @@ class CaseStudyIndexPage(Page):
 
     template = "home/case_study_index_page.html"
 
+    projects_per_page = 12
+
     def get_context(self, request, *args, **kwargs):
         context = super().get_context(request, *args, **kwargs)
-        projects = CaseStudyPage.objects.live().public().child_of(self).order_by("-project_date")
+        live_projects = CaseStudyPage.objects.live().public().child_of(self)
+
+        # Barre de filtres : tous les tags utilisés, pas seulement ceux de la page courante
+        context["tags"] = Tag.objects.filter(Exists(
+            CaseStudyTag.objects.filter(tag=OuterRef("pk"), content_object__in=live_projects)
+        )).order_by("name")
+
+        # Tri complété par la clé primaire : ordre stable d'une page à l'autre
+        # même pour des projets à la même date
+        projects = (
+            live_projects
+            .only(*CaseStudyPage.listing_fields)
+            .prefetch_related("tagged_items__tag")
+            .order_by("-project_date", "-pk")
+        )
 
         # Filtrage par tag
         tag = request.GET.get("tag")
         if tag:
-            projects = projects.filter(tagged_items__tag__slug=tag)
-
-        context["projects"] = projects
+            # EXISTS plutôt qu'une jointure : pas de doublons, donc pas de DISTINCT
+            projects = projects.filter(Exists(
+                CaseStudyTag.objects.filter(content_object=OuterRef("pk"), tag__slug=tag)
+            ))
+
+        # Pagination : seules les études de cas de la page courante sont chargées
+        paginator = Paginator(projects, self.projects_per_page)
+        page = paginator.get_page(request.GET.get("page"))
+        page.object_list = list(page.object_list)
+        _prefetch_card_images(page.object_list)
+        context["projects"] = page
         context["current_tag"] = tag
         return context
 
@@ -440,26 +573,74 @@ class HomePage(Page):
 
     template = "home/home_page.html"
 
-    def get_context(self, request, *args, **kwargs):
-        context = super().get_context(request, *args, **kwargs)
+    # Durée de vie (en secondes) des listes mises en cache pour la page d'accueil
+    LISTINGS_CACHE_TIMEOUT = 3600
+
+    # Durée (en secondes) pendant laquelle le navigateur réutilise la page sans la redemander
+    BROWSER_CACHE_MAX_AGE = 300
+
+    def get_listings_cache_key(self):
+        return f"homectx:{self.pk}:{self.last_published_at.timestamp()}"
+
+    def get_listings(self):
+        """Listes affichées sur la page d'accueil : projets, témoignages, presse."""
+        listings = {}
 
         # Récupère l'index des projets pour construire l'URL du CTA
-        case_study_index = CaseStudyIndexPage.objects.live().child_of(self).first()
-        context["case_study_index"] = case_study_index
+        listings["case_study_index"] = CaseStudyIndexPage.objects.live().child_of(self).first()
 
+        # Les filtres d'images doivent correspondre aux balises {% image %} du template
         # 4 derniers projets publiés
-        context["featured_projects"] = (
-            CaseStudyPage.objects.live().public().order_by("-project_date")[:4]
+        listings["featured_projects"] = list(
+            CaseStudyPage.objects.live().public()
+            .only(*CaseStudyPage.listing_fields)
+            .prefetch_related("tagged_items__tag")
+            .order_by("-project_date")[:4]
+        )
+        _prefetch_card_images(listings["featured_projects"])
+
+        # 20 témoignages au plus, dans l'ordre de saisie (clé primaire indexée
+        # plutôt que le tri texte par défaut sur client_name)
+        listings["testimonials"] = list(
+            ClientTestimonial.objects
+            .prefetch_related(_prefetch_image("client_logo", "max-120x60"))
+            .order_by("pk")[:20]
         )
-
-        # Tous les témoignages
-        context["testimonials"] = ClientTestimonial.objects.all()
 
         # 3 dernières coupures de presse
-        context["press_cuts"] = PressCut.objects.all()[:3]
+        listings["press_cuts"] = list(
+            PressCut.objects.select_related("file")
+            .prefetch_related(_prefetch_image("cover_image", "fill-80x80"))[:3]
+        )
+
+        return listings
+
+    def get_context(self, request, *args, **kwargs):
+        context = super().get_context(request, *args, **kwargs)
+
+        # Jamais publiée (ex. prévisualisation d'un brouillon) : pas de cache
+        if self.last_published_at is None:
+            context.update(self.get_listings())
+            return context
+
+        cache_key = self.get_listings_cache_key()
+        listings = cache.get(cache_key)
+        if listings is None:
+            listings = self.get_listings()
+            cache.set(cache_key, listings, timeout=self.LISTINGS_CACHE_TIMEOUT)
+        context.update(listings)
 
         return context
 
+    def serve(self, request, *args, **kwargs):
+        response = super().serve(request, *args, **kwargs)
+
+        # Visiteurs anonymes : le navigateur peut réutiliser la page quelques minutes,
+        # puis la revalider via l'ETag (ConditionalGetMiddleware)
+        if not getattr(request, "is_preview", False) and not request.user.is_authenticated:
+            patch_cache_control(response, public=True, max_age=self.BROWSER_CACHE_MAX_AGE)
+        return response
+
 
 # ---------------------------------------------------------------------------
 # CONTACT PAGE
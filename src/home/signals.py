@@ -0,0 +1,44 @@
+"""
+signals.py — optimizer_labs / home app
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import CaseStudyPage, HomePage
+
+
+def clear_home_listings_cache(**kwargs):
+    """Invalide les listes mises en cache de toutes les pages d'accueil publiées."""
+    home_pages = HomePage.objects.exclude(last_published_at=None).only("last_published_at")
+    cache.delete_many([page.get_listings_cache_key() for page in home_pages])
+
+
+def clear_page_cache(**kwargs):
+    """Vide le cache des pages rendues (wagtail-cache) après une modification de contenu."""
+    if not getattr(settings, "WAGTAIL_CACHE", False):
+        return
+    from wagtailcache.cache import clear_cache
+
+    clear_cache()
+
+
+def clear_listing_caches():
+    """Vide les caches qui contiennent des cartes d'études de cas (accueil, index)."""
+    clear_home_listings_cache()
+    clear_page_cache()
+
+
+def refresh_card_rendition_urls(instance, **kwargs):
+    """Recalcule les vignettes des études de cas quand leur image principale change."""
+    pages = CaseStudyPage.objects.filter(main_image=instance)
+    for page in pages:
+        page.save(update_fields=["card_rendition_url"], clean=False)
+    if pages:
+        clear_listing_caches()
+
+
+def clear_deleted_card_rendition_urls(instance, **kwargs):
+    """Oublie les vignettes dont la rendition a été supprimée (ex. fichier image remplacé)."""
+    pages = CaseStudyPage.objects.filter(card_rendition_url=instance.url)
+    if pages.update(card_rendition_url=""):
+        clear_listing_caches()
@@ -1,6 +1,28 @@
-from home.models import HomePage
+import importlib
+import sys
+from datetime import date
+from unittest import mock
 
-from wagtail.models import Page, Site
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from home.models import (
+    CaseStudyGalleryImage,
+    CaseStudyIndexPage,
+    CaseStudyPage,
+    ContactFormField,
+    ContactPage,
+    HomePage,
+    PressCut,
+)
+
+from wagtail.images.models import Image
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Page, PageViewRestriction, Site
 from wagtail.test.utils import WagtailPageTestCase
 
 
@@ -40,3 +62,354 @@ class HomeTests(WagtailPageTestCase):
     def test_homepage_template_used(self):
         response = self.client.get(self.homepage.url)
         self.assertTemplateUsed(response, "home/home_page.html")
+
+
+class HomeListingsCacheTests(WagtailPageTestCase):
+    """
+    Tests for the cached homepage listings and their invalidation.
+    """
+
+    def setUp(self):
+        cache.clear()
+        root_page = Page.get_first_root_node()
+        self.homepage = HomePage(title="Home", hero_title="Hero", hero_subtitle="<p>Sub</p>")
+        root_page.add_child(instance=self.homepage)
+        self.homepage.save_revision().publish()
+        self.homepage.refresh_from_db()
+
+    def test_listings_are_cached_after_render(self):
+        self.homepage.get_context(RequestFactory().get("/"))
+        self.assertIsNotNone(cache.get(self.homepage.get_listings_cache_key()))
+
+    def test_anonymous_response_is_publicly_cacheable(self):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        response = self.homepage.serve(request)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn(f"max-age={HomePage.BROWSER_CACHE_MAX_AGE}", response["Cache-Control"])
+
+    def test_listings_query_count_does_not_grow_with_projects(self):
+        index = CaseStudyIndexPage(title="Projets")
+        self.homepage.add_child(instance=index)
+
+        def add_project(i):
+            project = CaseStudyPage(
+                title=f"Projet {i}",
+                project_date=date(2026, 1, i + 1),
+                client_sector="Boucherie",
+                context="<p>Contexte</p>",
+                problem="<p>Problème</p>",
+                solution="<p>Solution</p>",
+                results="<p>Résultats</p>",
+            )
+            index.add_child(instance=project)
+            project.tags.add("lean")
+            project.save()
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                listings = self.homepage.get_listings()
+                for project in listings["featured_projects"]:
+                    [item.tag.name for item in project.tagged_items.all()]
+            return len(queries)
+
+        add_project(0)
+        single = count_queries()
+        for i in range(1, 4):
+            add_project(i)
+        self.assertEqual(count_queries(), single)
+
+    def test_deleted_card_rendition_clears_cache(self):
+        image = Image.objects.create(title="Photo", file=get_test_image_file())
+        index = CaseStudyIndexPage(title="Projets")
+        self.homepage.add_child(instance=index)
+        index.add_child(instance=CaseStudyPage(
+            title="Projet",
+            project_date=date(2026, 1, 1),
+            client_sector="Boucherie",
+            main_image=image,
+            context="<p>Contexte</p>",
+            problem="<p>Problème</p>",
+            solution="<p>Solution</p>",
+            results="<p>Résultats</p>",
+        ))
+        self.homepage.get_context(RequestFactory().get("/"))
+
+        # Remplacement du fichier : Wagtail supprime les renditions existantes
+        image.renditions.all().delete()
+
+        self.assertIsNone(cache.get(self.homepage.get_listings_cache_key()))
+        self.assertEqual(CaseStudyPage.objects.get().card_rendition_url, "")
+
+    def test_press_cut_save_clears_cache(self):
+        self.homepage.get_context(RequestFactory().get("/"))
+        PressCut.objects.create(title="Article", source="Journal", date=date(2026, 1, 1))
+        self.assertIsNone(cache.get(self.homepage.get_listings_cache_key()))
+
+
+    def test_view_restriction_clears_cache(self):
+        index = CaseStudyIndexPage(title="Projets")
+        self.homepage.add_child(instance=index)
+        project = CaseStudyPage(
+            title="Projet",
+            project_date=date(2026, 1, 1),
+            client_sector="Boucherie",
+            context="<p>Contexte</p>",
+            problem="<p>Problème</p>",
+            solution="<p>Solution</p>",
+            results="<p>Résultats</p>",
+        )
+        index.add_child(instance=project)
+        context = self.homepage.get_context(RequestFactory().get("/"))
+        self.assertEqual(len(context["featured_projects"]), 1)
+
+        PageViewRestriction.objects.create(
+            page=project, restriction_type=PageViewRestriction.PASSWORD, password="secret"
+        )
+
+        context = self.homepage.get_context(RequestFactory().get("/"))
+        self.assertEqual(len(context["featured_projects"]), 0)
+
+class CaseStudyIndexTests(WagtailPageTestCase):
+    """
+    Tests for the case study listing.
+    """
+
+    def setUp(self):
+        root_page = Page.get_first_root_node()
+        homepage = HomePage(title="Home", hero_title="Hero", hero_subtitle="<p>Sub</p>")
+        root_page.add_child(instance=homepage)
+        self.index = CaseStudyIndexPage(title="Projets")
+        homepage.add_child(instance=self.index)
+        for i in range(CaseStudyIndexPage.projects_per_page + 1):
+            self.index.add_child(instance=CaseStudyPage(
+                title=f"Projet {i}",
+                project_date=date(2026, 1, 1),
+                client_sector="Boucherie",
+                context="<p>Contexte</p>",
+                problem="<p>Problème</p>",
+                solution="<p>Solution</p>",
+                results="<p>Résultats</p>",
+            ))
+
+    def test_card_rendition_url_computed_on_save(self):
+        image = Image.objects.create(title="Photo", file=get_test_image_file())
+        project = CaseStudyPage.objects.first()
+        project.main_image = image
+        project.save()
+        self.assertEqual(
+            project.card_rendition_url,
+            image.get_rendition(CaseStudyPage.card_rendition_filter).url,
+        )
+
+    def test_cards_with_stored_thumbnail_skip_image_queries(self):
+        image = Image.objects.create(title="Photo", file=get_test_image_file())
+        for project in CaseStudyPage.objects.all():
+            project.main_image = image
+            project.save()
+        with CaptureQueriesContext(connection) as queries:
+            list(self.index.get_context(RequestFactory().get("/"))["projects"])
+        self.assertFalse([q for q in queries if "wagtailimages" in q["sql"]])
+
+    def test_rich_text_indexed_without_html(self):
+        project = CaseStudyPage.objects.first()
+        for search_field in CaseStudyPage.search_fields:
+            if search_field.field_name in ("context", "problem", "solution", "results"):
+                for value in search_field.get_value(project):
+                    self.assertNotIn("<", value)
+
+    def test_case_study_gallery_renders_srcset(self):
+        image = Image.objects.create(title="Photo", file=get_test_image_file())
+        project = CaseStudyPage.objects.first()
+        CaseStudyGalleryImage.objects.create(page=project, image=image, caption="Atelier")
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        response = project.serve(request)
+        response.render()
+        self.assertContains(response, "srcset=")
+        self.assertContains(response, 'loading="lazy"')
+
+    def test_gallery_images_committed_in_bulk(self):
+        image = Image.objects.create(title="Photo", file=get_test_image_file())
+        project = CaseStudyPage.objects.first()
+        project.gallery_images = [
+            CaseStudyGalleryImage(image=image, caption="Avant", sort_order=0),
+            CaseStudyGalleryImage(image=image, caption="Après", sort_order=1),
+        ]
+        project.save()
+        before, after = project.gallery_images.all()
+
+        project = CaseStudyPage.objects.get(pk=project.pk)
+        after.caption = "Après travaux"
+        project.gallery_images = [
+            after,
+            CaseStudyGalleryImage(image=image, caption="Équipe", sort_order=1),
+        ]
+        project.save()
+
+        self.assertEqual(
+            [(item.pk == after.pk, item.caption) for item in project.gallery_images.all()],
+            [(True, "Après travaux"), (False, "Équipe")],
+        )
+        self.assertFalse(CaseStudyGalleryImage.objects.filter(pk=before.pk).exists())
+
+    def test_invalid_save_keeps_gallery_images(self):
+        image = Image.objects.create(title="Photo", file=get_test_image_file())
+        project = CaseStudyPage.objects.first()
+        project.gallery_images = [CaseStudyGalleryImage(image=image, sort_order=0)]
+        project.save()
+
+        project = CaseStudyPage.objects.get(pk=project.pk)
+        project.title = ""
+        project.gallery_images = []
+        with self.assertRaises(ValidationError):
+            project.save()
+
+        self.assertEqual(CaseStudyGalleryImage.objects.filter(page=project).count(), 1)
+
+    def test_projects_are_paginated(self):
+        context = self.index.get_context(RequestFactory().get("/"))
+        self.assertEqual(len(context["projects"]), CaseStudyIndexPage.projects_per_page)
+        self.assertTrue(context["projects"].has_next())
+
+    def test_filter_by_tag(self):
+        project = CaseStudyPage.objects.first()
+        project.tags.add("lean", "kaizen")
+        project.save()
+        context = self.index.get_context(RequestFactory().get("/", {"tag": "lean"}))
+        self.assertEqual([p.pk for p in context["projects"]], [project.pk])
+
+    def test_last_page(self):
+        first_page = self.index.get_context(RequestFactory().get("/"))["projects"]
+        last_page = self.index.get_context(RequestFactory().get("/", {"page": 2}))["projects"]
+        self.assertEqual(len(last_page), 1)
+        self.assertFalse({p.pk for p in first_page} & {p.pk for p in last_page})
+
+    def test_filter_bar_lists_tags_from_every_page(self):
+        last_project = CaseStudyPage.objects.order_by("-project_date", "-pk").last()
+        last_project.tags.add("kaizen")
+        last_project.save()
+        context = self.index.get_context(RequestFactory().get("/"))
+        self.assertNotIn(last_project.pk, [p.pk for p in context["projects"]])
+        self.assertEqual([tag.slug for tag in context["tags"]], ["kaizen"])
+
+
+class ContactPageTests(WagtailPageTestCase):
+    """
+    Tests for the contact form.
+    """
+
+    def setUp(self):
+        root_page = Page.get_first_root_node()
+        homepage = HomePage(title="Home", hero_title="Hero", hero_subtitle="<p>Sub</p>")
+        root_page.add_child(instance=homepage)
+        self.contact_page = ContactPage(title="Contact")
+        homepage.add_child(instance=self.contact_page)
+        for label, field_type in [
+            ("Nom", "singleline"),
+            ("Email", "email"),
+            ("Sujet", "dropdown"),
+            ("Message", "multiline"),
+        ]:
+            ContactFormField.objects.create(
+                page=self.contact_page,
+                label=label,
+                field_type=field_type,
+                choices="Devis\nQuestion" if field_type == "dropdown" else "",
+            )
+
+    def test_form_fields_loaded_in_one_query(self):
+        page = ContactPage.objects.get(pk=self.contact_page.pk)
+        with self.assertNumQueries(1):
+            form = page.get_form()
+        self.assertEqual(len(form.fields), 4)
+
+
+def production_middleware():
+    """MIDDLEWARE des réglages de production, lus dans des modules neufs."""
+    # Réglages base + production réimportés à part : production.py modifie en
+    # place les listes de base.py, partagées avec les réglages des tests
+    with mock.patch.dict(sys.modules):
+        for name in ("optimzer_labs.settings.base", "optimzer_labs.settings.production"):
+            sys.modules.pop(name, None)
+        return importlib.import_module("optimzer_labs.settings.production").MIDDLEWARE
+
+
+class ProductionPageCacheTests(WagtailPageTestCase):
+    """
+    Tests for conditional GETs through the production middleware stack (wagtail-cache).
+    """
+
+    def setUp(self):
+        root_page = Page.get_first_root_node()
+        self.homepage = HomePage(title="Home", hero_title="Hero", hero_subtitle="<p>Sub</p>")
+        root_page.add_child(instance=self.homepage)
+        Site.objects.all().delete()
+        Site.objects.create(hostname="testserver", root_page=self.homepage, is_default_site=True)
+
+        settings_override = override_settings(
+            MIDDLEWARE=production_middleware(),
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "pagecache": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "pagecache",
+                    "TIMEOUT": 60 * 60,
+                },
+            },
+            WAGTAIL_CACHE=True,
+            WAGTAIL_CACHE_BACKEND="pagecache",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_revalidation_after_clear_does_not_cache_304(self):
+        from wagtailcache.cache import clear_cache
+
+        first = self.client.get("/")
+        self.assertEqual(first.status_code, 200)
+
+        clear_cache()
+        revalidated = self.client.get("/", headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(revalidated.status_code, 304)
+
+        fresh = self.client.get("/")
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(fresh.content, first.content)
+
+    def test_browser_revalidates_cached_pages(self):
+        self.homepage.add_child(instance=CaseStudyIndexPage(title="Projets"))
+        self.client.get("/projets/")
+        cached = self.client.get("/projets/")
+        self.assertEqual(cached["X-Wagtail-Cache"], "hit")
+        self.assertEqual(cached["Cache-Control"], "no-cache")
+        self.assertFalse(cached.has_header("Expires"))
+
+        # La page d'accueil garde sa durée propre
+        homepage = self.client.get("/")
+        self.assertIn(f"max-age={HomePage.BROWSER_CACHE_MAX_AGE}", homepage["Cache-Control"])
+
+    def test_view_restriction_clears_page_cache(self):
+        index = CaseStudyIndexPage(title="Projets")
+        self.homepage.add_child(instance=index)
+        project = CaseStudyPage(
+            title="Projet",
+            project_date=date(2026, 1, 1),
+            client_sector="Boucherie",
+            context="<p>Contexte confidentiel</p>",
+            problem="<p>Problème</p>",
+            solution="<p>Solution</p>",
+            results="<p>Résultats</p>",
+        )
+        index.add_child(instance=project)
+        self.client.get(project.url)
+        cached = self.client.get(project.url)
+        self.assertEqual(cached["X-Wagtail-Cache"], "hit")
+
+        PageViewRestriction.objects.create(
+            page=project, restriction_type=PageViewRestriction.PASSWORD, password="secret"
+        )
+
+        response = self.client.get(project.url)
+        self.assertTemplateUsed(response, "wagtailcore/password_required.html")
+        self.assertNotContains(response, "Contexte confidentiel")
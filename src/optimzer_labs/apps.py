@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class OptimzerLabsConfig(AppConfig):
+    name = "optimzer_labs"
+
+    def ready(self):
+        from .log_queue import start_log_queue_listener
+
+        # Logs de production écrits en arrière-plan, dans chaque processus
+        start_log_queue_listener()
@@ -0,0 +1,38 @@
+"""
+log_queue.py — écriture des logs en arrière-plan (handler "queue" de LOGGING)
+
+Le QueueListener construit par dictConfig n'est pas démarré automatiquement, et
+son thread ne survit pas à un fork (uWSGI sans lazy-apps, gunicorn --preload) :
+on le démarre dans chaque processus, y compris les commandes manage.py.
+"""
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueListener
+
+from django.conf import settings
+
+
+def _restart_in_child(queue_handler):
+    # La file du parent a pu être copiée avec son verrou pris : on repart d'une file neuve
+    old_listener = queue_handler.listener
+    queue_handler.queue = queue.Queue()
+    queue_handler.listener = QueueListener(
+        queue_handler.queue,
+        *old_listener.handlers,
+        respect_handler_level=old_listener.respect_handler_level,
+    )
+    queue_handler.listener.start()
+
+
+def start_log_queue_listener():
+    """Démarre le QueueListener du handler "queue", s'il est configuré."""
+    if "queue" not in settings.LOGGING.get("handlers", {}):
+        return
+
+    queue_handler = logging.getHandlerByName("queue")
+    queue_handler.listener.start()
+    # Vide la file à la sortie du processus (listener courant, y compris après un fork)
+    atexit.register(lambda: queue_handler.listener.stop())
+    os.register_at_fork(after_in_child=lambda: _restart_in_child(queue_handler))
@@ -0,0 +1,26 @@
+"""
+middleware.py — en-têtes de cache navigateur des pages servies par wagtail-cache
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_max_age
+
+
+class RevalidatePageCacheMiddleware:
+    """
+    wagtail-cache envoie au navigateur la durée du cache de pages (max-age et
+    Expires) : une publication ne lui parviendrait qu'une fois ce délai écoulé.
+    Les pages sans durée propre sont donc renvoyées en no-cache, et le navigateur
+    les revalide à chaque visite via l'ETag (304 sans corps si rien n'a changé).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.page_cache_timeout = caches[settings.WAGTAIL_CACHE_BACKEND].default_timeout
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if get_max_age(response) == self.page_cache_timeout:
+            response.headers.pop("Expires", None)
+            response["Cache-Control"] = "no-cache"
+        return response
@@ -24,6 +24,7 @@ BASE_DIR = PROJECT_DIR.parent
 # Application definition
 
 INSTALLED_APPS = [
+    "optimzer_labs",
     "home",
     "search",
     "django.contrib.postgres",
@@ -14,8 +14,46 @@ SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = 'DENY'
 
-# Fichiers statiques
-STORAGES["staticfiles"]["BACKEND"] = "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+# Fichiers statiques — compressés (gzip + Brotli) une fois pour toutes au collectstatic
+STORAGES["staticfiles"]["BACKEND"] = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+)
+
+# Cache partagé entre les workers (listes de la page d'accueil, renditions...)
+# et cache des pages rendues (wagtail-cache), dans une base Redis séparée car
+# elle est vidée entièrement à chaque publication
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/1",
+    },
+    "pagecache": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/2",
+        "TIMEOUT": 60 * 60,
+    },
+}
+
+INSTALLED_APPS += ["wagtailcache"]
+# Requêtes conditionnelles : ETag calculé sur le contenu rendu, 304 sans corps
+# quand le navigateur a déjà la page. En tête de liste, à l'extérieur de
+# wagtail-cache : sinon une 304 serait mise en cache et servie à tout le monde.
+# Les navigateurs revalident les pages à chaque visite, au lieu de garder la
+# durée du cache de pages (voir optimzer_labs/middleware.py)
+MIDDLEWARE = [
+    "django.middleware.http.ConditionalGetMiddleware",
+    "optimzer_labs.middleware.RevalidatePageCacheMiddleware",
+    "wagtailcache.cache.UpdateCacheMiddleware",
+    *MIDDLEWARE,
+    "wagtailcache.cache.FetchFromCacheMiddleware",
+]
+WAGTAIL_CACHE = True
+WAGTAIL_CACHE_BACKEND = "pagecache"
+
+# Sessions dans Redis plutôt qu'en base : plus de SELECT sur django_session par requête
+SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 
 # Email pour les erreurs 500
 ADMINS = [('Optimizer Labs', 'support@optimizer-labs.fr')]
@@ -24,7 +62,14 @@ SERVER_EMAIL = 'support@optimizer-labs.fr'
 # Wagtail
 WAGTAILADMIN_BASE_URL = 'https://www.optimizer-labs.fr'
 
+# Recherche — sous PostgreSQL, le backend "database" indexe déjà dans une colonne
+# tsvector + index GIN ; on lui indique la langue pour la racinisation
+# (relancer `manage.py update_index` après changement)
+WAGTAILSEARCH_BACKENDS["default"]["SEARCH_CONFIG"] = "french"
+
 # Logs — affiche les erreurs dans la console AlwaysData
+# Les requêtes ne font que déposer les messages dans une file ; l'écriture sur
+# stderr se fait dans le thread du QueueListener (voir optimzer_labs/log_queue.py)
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -32,9 +77,13 @@ LOGGING = {
         'console': {
             'class': 'logging.StreamHandler',
         },
+        'queue': {
+            'class': 'logging.handlers.QueueHandler',
+            'handlers': ['console'],
+        },
     },
     'root': {
-        'handlers': ['console'],
+        'handlers': ['queue'],
         'level': 'WARNING',
     },
 }
@@ -43,4 +92,9 @@ LOGGING = {
 try:
     from .local import *
 except ImportError:
-    pass
\ No newline at end of file
+    pass
+
+# Connexions persistantes à la base (DATABASES est défini dans local.py) :
+# plus de poignée de main TCP/TLS/authentification à chaque requête
+DATABASES["default"].setdefault("CONN_MAX_AGE", 600)
+DATABASES["default"].setdefault("CONN_HEALTH_CHECKS", True)